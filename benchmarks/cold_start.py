@@ -0,0 +1,84 @@
+"""
+Measures the cold start of a Vines worker: `import vines`, building an application with
+many routes, and the first request, which pays for the lazily compiled route regexes.
+
+    python benchmarks/cold_start.py --routes 5000 --runs 10
+    python benchmarks/cold_start.py --snapshot routes.json
+
+Every run happens in a fresh interpreter so module and regex caches start empty.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+RUN = '''
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+import vines
+imported = time.perf_counter()
+
+from vines import Vines
+from vines.http import HttpResponse
+from vines.routing import Route, load_route_table
+
+snapshot, count = sys.argv[1], int(sys.argv[2])
+if snapshot:
+    with open(snapshot) as file:
+        load_route_table(file)
+loaded = time.perf_counter()
+
+def endpoint(request):
+    return HttpResponse('ok')
+
+app = Vines(routes=[
+    Route(f'/resource{index}/{{id:int}}/items/{{name:str}}', endpoint, methods=['GET'])
+    for index in range(count)
+])
+built = time.perf_counter()
+
+async def request(path):
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    async def send(message):
+        pass
+    await app({'type': 'http', 'method': 'GET', 'path': path, 'headers': []}, receive, send)
+
+asyncio.run(request(f'/resource{count - 1}/1/items/a'))
+served = time.perf_counter()
+
+print(json.dumps({
+    'import': imported - started,
+    'load_snapshot': loaded - imported,
+    'build_app': built - loaded,
+    'first_request': served - built,
+}))
+'''
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--routes', type=int, default=5000, help='Number of routes of the application.')
+    parser.add_argument('--runs', type=int, default=10, help='Number of fresh interpreters to measure.')
+    parser.add_argument('--snapshot', default='', help='A route table written by vines.routing.dump_route_table.')
+    args = parser.parse_args()
+
+    results: list[dict[str, float]] = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, '-c', RUN, args.snapshot, str(args.routes)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(output))
+
+    print(f'{args.routes} routes, median of {args.runs} runs')
+    for phase in results[0]:
+        timings = [result[phase] * 1000 for result in results]
+        print(f'  {phase:<14} {statistics.median(timings):8.2f} ms  (min {min(timings):.2f} ms)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+import atexit
+import json
+import sys
+import threading
+import time
+from typing import Callable, NamedTuple, TextIO, Awaitable
+
+from vines.http import HttpRequest, HttpResponse
+from vines.core.types import Message, Send, Scope
+
+__all__ = ['AccessLog', 'AccessRecord']
+
+
+class AccessRecord(NamedTuple):
+    timestamp: float
+    method: str
+    route: str
+    status: int
+    bytes: int
+    handle_ns: int
+    send_ns: int
+
+
+def format_json(record: AccessRecord) -> str:
+    return json.dumps({
+        'time': record.timestamp,
+        'method': record.method,
+        'route': record.route,
+        'status': record.status,
+        'bytes': record.bytes,
+        'handle_us': record.handle_ns // 1000,
+        'send_us': record.send_ns // 1000,
+    })
+
+
+def format_text(record: AccessRecord) -> str:
+    timestamp = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.timestamp))
+    return (
+        f'{timestamp} {record.method} {record.route} {record.status} {record.bytes} '
+        f'{record.handle_ns // 1000}us {record.send_ns // 1000}us'
+    )
+
+
+FORMATTERS: dict[str, Callable[[AccessRecord], str]] = {
+    'json': format_json,
+    'text': format_text,
+}
+
+
+class AccessLog:
+    """
+    An access log that keeps the request path free of I/O.
+
+    Requests are recorded into a preallocated ring buffer and a background thread writes
+    them out in batches every `flush_interval` seconds. When the buffer is full, new records
+    are dropped and counted in `dropped` instead of slowing the requests down. Records that
+    fail to be formatted or written are counted in `errors` and the writer carries on.
+
+    The route is logged as its template ('/users/{id:int}'), or as the raw path when no
+    route matched. The duration is split between handling (middleware and endpoint) and
+    sending the response.
+
+    **Parameters**
+    - stream: The stream to write to, defaults to `sys.stdout`.
+    - path: A file to append to, instead of `stream`.
+    - format: 'json' for JSON lines, 'text', or a callable formatting an `AccessRecord`.
+    - capacity: The number of records the buffer holds.
+    - flush_interval: Seconds between two batches.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        path: str | None = None,
+        format: str | Callable[[AccessRecord], str] = 'json',
+        capacity: int = 65536,
+        flush_interval: float = 0.5,
+    ) -> None:
+        if isinstance(format, str):
+            if format not in FORMATTERS:
+                raise ValueError(f'Unknown access log format {format}, expected one of {list(FORMATTERS)}.')
+            format = FORMATTERS[format]
+
+        self.path: str | None = path
+        self.stream: TextIO | None = stream
+        self.format: Callable[[AccessRecord], str] = format
+        self.capacity: int = capacity
+        self.flush_interval: float = flush_interval
+        self.dropped: int = 0
+        self.errors: int = 0
+
+        self._buffer: list[tuple | None] = [None] * capacity
+        # Records carry `perf_counter_ns` timestamps, turned into wall-clock time when written.
+        self._epoch: float = time.time()
+        self._epoch_ns: int = time.perf_counter_ns()
+        self._written: int = 0
+        self._flushed: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if self.stream is None:
+            self.stream = open(self.path, 'a', encoding='utf-8') if self.path else sys.stdout
+
+        self._closed.clear()
+        self._thread = threading.Thread(target=self._run, name='vines-access-log', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._closed.set()
+        self._thread.join()
+        self._thread = None
+        if self.path and self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def record(self, scope: Scope, status: int, size: int, started: int, handled: int, finished: int) -> None:
+        """Record a request, the last three arguments being `time.perf_counter_ns` values."""
+        written = self._written
+        if written - self._flushed >= self.capacity:
+            self.dropped += 1
+            return
+
+        # Only the scope reference and integers are stored here; the route template, timestamp
+        # and AccessRecord are built on the writer thread, which then releases the scope.
+        self._buffer[written % self.capacity] = (scope, status, size, started, handled, finished)
+        self._written = written + 1
+
+        if self._thread is None:
+            self.start()
+
+    def flush(self) -> None:
+        """Format and write every pending record."""
+        with self._lock:
+            start, end = self._flushed, self._written
+            if start == end:
+                return
+
+            buffer, capacity, format = self._buffer, self.capacity, self.format
+            epoch, epoch_ns = self._epoch, self._epoch_ns
+            lines: list[str] = []
+            for index in range(start, end):
+                scope, status, size, started, handled, finished = buffer[index % capacity]
+                buffer[index % capacity] = None
+                route = scope.get('route')
+                try:
+                    lines.append(format(AccessRecord(
+                        epoch + (started - epoch_ns) / 1e9,
+                        scope['method'],
+                        scope.get('route_prefix', '') + route.path if route is not None else scope['path'],
+                        status,
+                        size,
+                        handled - started,
+                        finished - handled,
+                    )))
+                except Exception:
+                    self.errors += 1
+            self._flushed = end
+            if not lines:
+                return
+
+            lines.append('')
+            try:
+                self.stream.write('\n'.join(lines))
+                self.stream.flush()
+            except Exception:
+                # E.g. a full disk, the batch is lost but later ones may succeed.
+                self.errors += len(lines) - 1
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    async def __call__(
+        self,
+        handler: Callable[[HttpRequest], Awaitable[HttpResponse]],
+        request: HttpRequest,
+        send: Send,
+    ) -> None:
+        """Run the request through `handler`, send the response and record the exchange."""
+        scope: Scope = request.scope
+        started: int = time.perf_counter_ns()
+        response: HttpResponse = await handler(request)
+        handled: int = time.perf_counter_ns()
+
+        if type(response).__call__ is HttpResponse.__call__:
+            # The body is known up front, only bodies produced while sending need counting.
+            await response(scope, request.receive, send)
+            size: int = 0 if scope['method'] == 'HEAD' else len(response.body)
+        else:
+            size = 0
+
+            async def counting_send(message: Message) -> None:
+                nonlocal size
+                if message['type'] == 'http.response.body':
+                    size += len(message.get('body', b''))
+                await send(message)
+
+            await response(scope, request.receive, counting_send)
+
+        self.record(scope, response.status_code, size, started, handled, time.perf_counter_ns())
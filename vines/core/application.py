@@ -1,10 +1,40 @@
-from typing import Any, Sequence, Callable
+from typing import Any, Sequence, Callable, TYPE_CHECKING
 
-from vines.routing import Router, Route
+from vines.routing import Router, Route, Mount
 from vines.middleware import Middleware
 from vines.middleware.error import ServerErrorMiddleware, ExceptionMiddleware
 from vines.http import HttpRequest, HttpResponse
-from vines.core.types import Scope, Receive, Send
+from vines.core.types import App, Scope, Receive, Send
+from vines.core.accesslog import AccessLog
+
+if TYPE_CHECKING:
+    from vines.core.workers import ProcessPool
+
+
+def request_host(scope: Scope) -> str | None:
+    """The host a request is addressed to, lowercased and without port or trailing dot."""
+    for key, value in scope.get('headers', ()):
+        if key == b'host':
+            host = value.decode('latin1').lower()
+            break
+    else:
+        return None
+
+    if host.startswith('['):
+        # IPv6 literal, e.g. [::1]:8000.
+        return host[:host.find(']') + 1]
+    return host.partition(':')[0].rstrip('.')
+
+
+class HostRouter(Router):
+    """Runs the router of a host behind the error handling middleware, leaving the router untouched."""
+
+    def __init__(self, router: Router) -> None:
+        super().__init__('/', middleware=[ServerErrorMiddleware(), ExceptionMiddleware()])
+        self.router: Router = router
+
+    async def handle(self, request: HttpRequest) -> HttpResponse:
+        return await self.router(request)
 
 
 class Vines:
@@ -12,12 +42,17 @@ class Vines:
     Creates an ASGI Application instance.
 
     **Parameters**
-    - routes: A sequence of Route objects defining the application's routes.
+    - routes: A sequence of Route objects defining the application's routes. Mount objects
+      in it are dispatched before any routing, see `mount`.
     - middleware: A sequence of Middleware objects to be applied to requests.
     - settings: A dictionary of settings to override the default settings.
+    - access_log: An AccessLog recording every request, disabled by default.
+    - hosts: Routers serving specific hosts, see `add_host`.
     """
     default_settings: dict[str, Any] = {
         'DEBUG': True,
+        'DEBUG_TRACEBACK_LIMIT': 10,
+        'PROCESS_POOL': {},
     }
 
     def __init__(
@@ -25,42 +60,122 @@ class Vines:
         routes: Sequence[Route] | None = None,
         middleware: Sequence[Middleware] | None = None,
         settings: dict[str, Any] | None = None,
+        access_log: AccessLog | None = None,
+        hosts: dict[str, Router] | None = None,
     ) -> None:
         self.settings = Vines.default_settings | (settings or {})
+        self.access_log = access_log
+        self._process_pool: 'ProcessPool | None' = None
+        self.mounts: list[Mount] = [route for route in routes or [] if isinstance(route, Mount)]
         self.router = Router(
             path='/',
-            routes=routes,
+            routes=[route for route in routes or [] if not isinstance(route, Mount)],
             middleware=[
                 ServerErrorMiddleware(),
                 ExceptionMiddleware()
             ] + list(middleware or [])
         )
+        # Exact hosts, and wildcard hosts keyed by their parent domain ('*.example.com' -> 'example.com').
+        self.hosts: dict[str, HostRouter] = {}
+        self.wildcard_hosts: dict[str, HostRouter] = {}
+        for host, router in (hosts or {}).items():
+            self.add_host(host, router)
+
+    @property
+    def process_pool(self) -> 'ProcessPool':
+        """The pool running the routes declared with `offload=True`, configured by the 'PROCESS_POOL' setting."""
+        if self._process_pool is None:
+            # Imported here so applications that do not offload never load multiprocessing.
+            from vines.core.workers import ProcessPool
+            self._process_pool = ProcessPool(**self.settings['PROCESS_POOL'])
+        return self._process_pool
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Entrypoint for the ASGI application."""
+        if self.mounts and 'path' in scope:
+            for mount in self.mounts:
+                if mount.matches_path(scope['path']):
+                    return await mount.handle(scope, receive, send)
+
         if not scope['type'] == 'http':
             raise ValueError(f'Vines can only handle ASGI/HTTP connections, not {scope['type']}.')
 
         scope['app'] = self
 
+        router: Router = self.router
+        if self.hosts or self.wildcard_hosts:
+            router = self.host_router(scope)
+
         request: HttpRequest = HttpRequest(scope, receive)
-        response: HttpResponse = await self.router(request)
+        if self.access_log is not None:
+            await self.access_log(router, request, send)
+            return
+
+        response: HttpResponse = await router(request)
         await response(scope, receive, send)
 
-    def route(self, path: str, methods: list[str] | None = None) -> Callable:
-        return self.router.route(path, methods=methods)
+    def add_host(self, host: str, router: Router) -> None:
+        """
+        Serve the requests addressed to `host` with `router` instead of the application's routes.
+        `host` is a domain name, e.g. 'api.example.com', or a wildcard matching one level of
+        subdomains, e.g. '*.example.com', whose matched label is set as 'subdomain' in the scope.
+
+        The router is dispatched to with a single dict lookup on the Host header, before any
+        path matching. It runs its own middleware, not the application's, behind the error
+        handling middleware. A router may serve several hosts.
+        """
+        host = host.lower().rstrip('.')
+        host_router = next(
+            (existing for existing in (*self.hosts.values(), *self.wildcard_hosts.values()) if existing.router is router),
+            None,
+        ) or HostRouter(router)
+        if host.startswith('*.'):
+            self.wildcard_hosts[host[2:]] = host_router
+        else:
+            self.hosts[host] = host_router
+
+    def host_router(self, scope: Scope) -> Router:
+        """The router serving the host of a request, the application's router if no host matches."""
+        host = request_host(scope)
+        if host is None:
+            return self.router
+
+        router = self.hosts.get(host)
+        if router is not None:
+            return router
+
+        subdomain, _, parent = host.partition('.')
+        router = self.wildcard_hosts.get(parent)
+        if router is not None:
+            scope['subdomain'] = subdomain
+            return router
+        return self.router
+
+    def mount(self, path: str, app: App) -> None:
+        """
+        Mount a raw ASGI application under `path`. Its connections, websockets included, are
+        passed through untouched apart from 'path' and 'root_path', bypassing the middleware.
+        """
+        self.mounts.append(Mount(path, app))
+
+    def url_for(self, name: str, /, **params: Any) -> str:
+        """Build the path of the route named `name`, see `Router.url_for`. Host routers have their own."""
+        return self.router.url_for(name, **params)
+
+    def route(self, path: str, methods: list[str] | None = None, **options: Any) -> Callable:
+        return self.router.route(path, methods=methods, **options)
 
-    def get(self, path: str) -> Callable:
-        return self.router.get(path)
+    def get(self, path: str, **options: Any) -> Callable:
+        return self.router.get(path, **options)
 
-    def post(self, path: str) -> Callable:
-        return self.router.post(path)
+    def post(self, path: str, **options: Any) -> Callable:
+        return self.router.post(path, **options)
 
-    def put(self, path: str) -> Callable:
-        return self.router.put(path)
+    def put(self, path: str, **options: Any) -> Callable:
+        return self.router.put(path, **options)
 
-    def patch(self, path: str) -> Callable:
-        return self.router.patch(path)
+    def patch(self, path: str, **options: Any) -> Callable:
+        return self.router.patch(path, **options)
 
-    def delete(self, path: str) -> Callable:
-        return self.router.delete(path)
+    def delete(self, path: str, **options: Any) -> Callable:
+        return self.router.delete(path, **options)
@@ -0,0 +1,198 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, NamedTuple
+
+from vines.http import HttpRequest, HttpResponse, PreparedResponse, prepare_response
+from vines.http.exceptions import HttpException
+from vines.http.status import HTTP_503_SERVICE_UNAVAILABLE
+from vines.core.types import Scope, Message
+
+__all__ = ['ProcessPool', 'RequestSnapshot']
+
+
+class RequestSnapshot(NamedTuple):
+    """The picklable part of a request, everything an offloaded endpoint can see."""
+    method: str
+    scheme: str
+    root_path: str
+    path: str
+    query_string: bytes
+    headers: list[tuple[bytes, bytes]]
+    params: dict[str, Any]
+    body: bytes
+
+    @classmethod
+    async def from_request(cls, request: HttpRequest) -> 'RequestSnapshot':
+        scope = request.scope
+        return cls(
+            scope['method'],
+            scope.get('scheme', 'http'),
+            scope.get('root_path', ''),
+            scope['path'],
+            scope.get('query_string', b''),
+            list(scope.get('headers', [])),
+            dict(scope.get('params', {})),
+            await request.body(),
+        )
+
+    def scope(self) -> Scope:
+        return {
+            'type': 'http',
+            'method': self.method,
+            'scheme': self.scheme,
+            'root_path': self.root_path,
+            'path': self.path,
+            'query_string': self.query_string,
+            'headers': self.headers,
+            'params': self.params,
+        }
+
+
+class RenderedResponse(NamedTuple):
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+class RenderedException(NamedTuple):
+    """An `HttpException` raised in a worker, sent back as plain values since exceptions
+    with required arguments (e.g. `NotFoundException`) cannot be unpickled."""
+    status_code: int
+    message: str
+    detail: Any
+
+
+# Event loop of a worker process, created once by `initialize_worker`.
+worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+def initialize_worker(initializer: Callable[[], None] | None) -> None:
+    global worker_loop
+    worker_loop = asyncio.new_event_loop()
+    if initializer is not None:
+        initializer()
+
+
+def warm_up() -> None:
+    pass
+
+
+def run_endpoint(
+    endpoint: Callable[[HttpRequest], Any],
+    snapshot: RequestSnapshot,
+) -> RenderedResponse | RenderedException:
+    """Run an endpoint in a worker process and return the rendered response."""
+    async def receive() -> Message:
+        return {'type': 'http.request', 'body': snapshot.body, 'more_body': False}
+
+    scope = snapshot.scope()
+    try:
+        response: Any = endpoint(HttpRequest(scope, receive))
+        if asyncio.iscoroutine(response):
+            response = worker_loop.run_until_complete(response)
+        prepared: PreparedResponse = worker_loop.run_until_complete(prepare_response(response, scope))
+    except HttpException as e:
+        return RenderedException(e.status_code, e.message, e.detail)
+    return RenderedResponse(prepared.status_code, prepared.encode_headers(), prepared.body)
+
+
+class ProcessPool:
+    """
+    Runs CPU-bound endpoints in a pool of worker processes, enabled per route with `offload`.
+
+    The endpoint receives an `HttpRequest` rebuilt from a `RequestSnapshot` (method, path,
+    query string, headers, params and body; `request.app` is not available) and its response
+    is rendered in the worker and sent back as bytes. Endpoints must be picklable, that is
+    defined at the top level of a module.
+
+    Workers are started with the 'spawn' method. When the pool starts, every worker is started
+    and runs `initializer`. Once the pool has handled `max_tasks_per_child` requests per worker,
+    a fresh pool is started and the old one is shut down after its last request, which
+    bounds how much memory a leaky endpoint can accumulate. When `max_queue` requests are
+    already running or waiting for a worker, new ones are rejected with a 503. A worker dying
+    abruptly fails the requests in the pool with a 503, and the next request starts a new pool.
+
+    **Parameters**
+    - max_workers: The number of worker processes, defaults to the number of CPUs.
+    - max_tasks_per_child: The number of requests after which a worker is replaced.
+    - max_queue: The maximum number of requests in the pool, defaults to twice `max_workers`.
+    - initializer: A callable run once in every worker, e.g. to load a model.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_tasks_per_child: int | None = None,
+        max_queue: int | None = None,
+        initializer: Callable[[], None] | None = None,
+    ) -> None:
+        self.max_workers: int = max_workers or multiprocessing.cpu_count()
+        self.max_tasks_per_child: int | None = max_tasks_per_child
+        self.max_queue: int = max_queue or self.max_workers * 2
+        self.initializer: Callable[[], None] | None = initializer
+        self.pending: int = 0
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._tasks: int = 0
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+
+        # Recycling is done here rather than with the executor's own `max_tasks_per_child`,
+        # which deadlocks when workers exit while requests are queued (CPython gh-115634).
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=initialize_worker,
+            initargs=(self.initializer,),
+        )
+        self._tasks = 0
+        # Workers are otherwise started on demand, which would slow the first requests down.
+        for _ in range(self.max_workers):
+            self._executor.submit(warm_up)
+
+    def close(self, wait: bool = True) -> None:
+        if self._executor is None:
+            return
+        # Requests already submitted still complete when the pool is recycled.
+        self._executor.shutdown(wait=wait, cancel_futures=wait)
+        self._executor = None
+
+    async def run(self, endpoint: Callable[[HttpRequest], Any], request: HttpRequest) -> HttpResponse:
+        if self.pending >= self.max_queue:
+            raise HttpException(
+                HTTP_503_SERVICE_UNAVAILABLE,
+                'Service Unavailable',
+                'Too many requests are waiting for a worker.'
+            )
+        if self.max_tasks_per_child is not None and self._tasks >= self.max_tasks_per_child * self.max_workers:
+            self.close(wait=False)
+        if self._executor is None:
+            self.start()
+
+        self._tasks += 1
+        self.pending += 1
+        executor: ProcessPoolExecutor = self._executor
+        try:
+            snapshot: RequestSnapshot = await RequestSnapshot.from_request(request)
+            future: Future = executor.submit(run_endpoint, endpoint, snapshot)
+            result: RenderedResponse | RenderedException = await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for using too much memory), which breaks the whole
+            # executor. It is dropped so the next request starts a fresh one.
+            if self._executor is executor:
+                self.close(wait=False)
+            raise HttpException(
+                HTTP_503_SERVICE_UNAVAILABLE,
+                'Service Unavailable',
+                'A worker process terminated abruptly.'
+            )
+        finally:
+            self.pending -= 1
+
+        if isinstance(result, RenderedException):
+            raise HttpException(result.status_code, result.message, result.detail)
+        return PreparedResponse(result.body, result.status_code, result.headers)
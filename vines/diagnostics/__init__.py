@@ -0,0 +1,2 @@
+from vines.diagnostics.profiler import Profiler
+from vines.diagnostics.watchdog import LoopWatchdog
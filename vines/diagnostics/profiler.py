@@ -0,0 +1,186 @@
+import sys
+import threading
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Sequence
+
+from vines.middleware import Middleware
+from vines.routing import Router, Route, route_template
+from vines.http import HttpRequest, HttpResponse, JSONResponse
+from vines.http.exceptions import HttpException
+
+__all__ = ['Profiler', 'find_route', 'find_route_template', 'UNROUTED']
+
+
+UNROUTED = '<unrouted>'
+
+
+def find_route_call(frame: FrameType | None) -> tuple[Route, FrameType] | None:
+    """Walk a frame stack outwards and return the `Route` currently executing on it with its `__call__` frame."""
+    while frame is not None:
+        if frame.f_code.co_name == '__call__':
+            route = frame.f_locals.get('self')
+            if isinstance(route, Route):
+                return route, frame
+        frame = frame.f_back
+    return None
+
+
+def find_route(frame: FrameType | None) -> Route | None:
+    """Walk a frame stack outwards and return the `Route` currently executing on it, if any."""
+    call = find_route_call(frame)
+    return call[0] if call is not None else None
+
+
+def find_route_template(frame: FrameType | None) -> str:
+    """
+    Return the full template of the route executing on a frame stack, nested router prefixes
+    included (e.g. '/v1/users/{id:int}'), read from the request of its `__call__` frame.
+    """
+    call = find_route_call(frame)
+    if call is None:
+        return UNROUTED
+    route, frame = call
+    request = frame.f_locals.get('request')
+    if isinstance(request, HttpRequest):
+        return route_template(request.scope) or route.path
+    return route.path
+
+
+def format_code(code: CodeType) -> str:
+    return f'{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})'
+
+
+class Profiler:
+    """
+    A statistical profiler that samples the stack of the event loop thread from a background thread.
+
+    Each sample is attributed to the full template of the `Route` running at that moment, and samples
+    are aggregated as collapsed stacks (`route;outer;...;inner count`), the input format of
+    flamegraph.pl and speedscope. The request path pays nothing: the attribution is read
+    from the sampled frames, not recorded by the routes.
+
+    **Parameters**
+    - interval: Seconds between two samples.
+    - max_depth: The maximum number of frames recorded per sample.
+    - all_threads: Sample every thread instead of only the thread that called `start`.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 128, all_threads: bool = False) -> None:
+        self.interval: float = interval
+        self.max_depth: int = max_depth
+        self.all_threads: bool = all_threads
+
+        self.samples: Counter[tuple[str, tuple[CodeType, ...]]] = Counter()
+        self._thread: threading.Thread | None = None
+        self._stopped: threading.Event = threading.Event()
+        self._target: int | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float | None = None) -> None:
+        if self._thread is not None:
+            return
+        if interval is not None:
+            # A zero interval would make the sampler spin and compete with the event loop for the GIL.
+            if not 0 < interval < float('inf'):
+                raise ValueError(f'The sampling interval must be a positive number of seconds, not {interval}.')
+            self.interval = interval
+
+        self._target = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='vines-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def reset(self) -> None:
+        self.samples.clear()
+
+    def _run(self) -> None:
+        own: int = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (not self.all_threads and thread_id != self._target):
+                    continue
+                self.sample(frame)
+
+    def sample(self, frame: FrameType) -> None:
+        route: str = find_route_template(frame)
+
+        stack: list[CodeType] = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        stack.reverse()
+
+        self.samples[(route, tuple(stack))] += 1
+
+    def collapsed(self, route: str | None = None) -> str:
+        """Export the samples as collapsed stacks, optionally restricted to a single route template."""
+        lines: list[str] = []
+        # Copied first, the sampler thread adds keys while the samples are exported.
+        for (path, stack), count in list(self.samples.items()):
+            if route is not None and path != route:
+                continue
+            frames = ';'.join(format_code(code).replace(';', ',') for code in stack)
+            lines.append(f'{path};{frames} {count}')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def totals(self) -> dict[str, int]:
+        """Return the number of samples collected for every route template."""
+        totals: Counter[str] = Counter()
+        for (path, _), count in list(self.samples.items()):
+            totals[path] += count
+        return dict(totals.most_common())
+
+    def as_router(self, path: str = '/_profiler', middleware: Sequence[Middleware] | None = None) -> Router:
+        """
+        Build an admin router controlling this profiler. It is not protected by default,
+        pass an authentication middleware before exposing it.
+
+        - `GET {path}/`: status and samples per route.
+        - `POST {path}/start?interval=0.01`, `POST {path}/stop`, `POST {path}/reset`.
+        - `GET {path}/stacks?route=/users/{id:int}`: collapsed stacks as text.
+        """
+
+        def status(request: HttpRequest) -> HttpResponse:
+            return JSONResponse({'running': self.running, 'interval': self.interval, 'routes': self.totals()})
+
+        def start(request: HttpRequest) -> HttpResponse:
+            interval = request.query_params.get('interval')
+            try:
+                self.start(float(interval) if interval else None)
+            except ValueError:
+                raise HttpException(message='Bad Request', detail=f'Invalid interval \'{interval}\'.')
+            return status(request)
+
+        def stop(request: HttpRequest) -> HttpResponse:
+            self.stop()
+            return status(request)
+
+        def reset(request: HttpRequest) -> HttpResponse:
+            self.reset()
+            return status(request)
+
+        def stacks(request: HttpRequest) -> HttpResponse:
+            return HttpResponse(self.collapsed(request.query_params.get('route')))
+
+        return Router(
+            path,
+            routes=[
+                Route('/', status, methods=['GET']),
+                Route('/start', start, methods=['POST']),
+                Route('/stop', stop, methods=['POST']),
+                Route('/reset', reset, methods=['POST']),
+                Route('/stacks', stacks, methods=['GET']),
+            ],
+            middleware=middleware,
+        )
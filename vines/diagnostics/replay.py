@@ -0,0 +1,198 @@
+"""
+Replays traffic captured by `CaptureMiddleware` through an application in-process and reports
+latency percentiles per route template, optionally compared with a previous run.
+
+    python -m vines.diagnostics.replay myproject.main:app capture.jsonl.gz \
+        --concurrency 32 --output run.json --baseline previous.json --threshold 10
+
+With a baseline, the exit status is 1 when the p99 of a route regressed by more than
+`--threshold` percent, so the replay can gate a deployment.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import math
+import sys
+import time
+from typing import Any, Iterable
+
+from vines.core.types import App, Scope, Message
+from vines.middleware.capture import load_capture
+from vines.routing import route_template
+
+__all__ = ['replay', 'ReplayReport']
+
+
+UNMATCHED = '<unmatched>'
+PERCENTILES: tuple[int, ...] = (50, 90, 99)
+
+
+def percentile(values: list[float], rank: int) -> float:
+    """The nearest-rank percentile of already sorted values."""
+    index = max(0, math.ceil(rank * len(values) / 100) - 1)
+    return values[index]
+
+
+class ReplayReport:
+    """Latencies, in milliseconds, and server errors of a replay, per route template."""
+
+    def __init__(self, routes: dict[str, dict[str, Any]] | None = None) -> None:
+        self.routes: dict[str, dict[str, Any]] = routes or {}
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[tuple[str, float, int]]) -> 'ReplayReport':
+        latencies: dict[str, list[float]] = {}
+        errors: dict[str, int] = {}
+        for route, latency, status in samples:
+            latencies.setdefault(route, []).append(latency)
+            errors[route] = errors.get(route, 0) + (status >= 500)
+
+        routes: dict[str, dict[str, Any]] = {}
+        for route, values in sorted(latencies.items()):
+            values.sort()
+            routes[route] = {
+                'count': len(values),
+                'errors': errors[route],
+                **{f'p{rank}': round(percentile(values, rank), 3) for rank in PERCENTILES},
+                'max': round(values[-1], 3),
+            }
+        return cls(routes)
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.routes, file, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'ReplayReport':
+        with open(path, encoding='utf-8') as file:
+            return cls(json.load(file))
+
+    def diff(self, baseline: 'ReplayReport') -> dict[str, dict[str, float]]:
+        """The relative change, in percent, of every percentile of the routes present in both reports."""
+        changes: dict[str, dict[str, float]] = {}
+        for route, stats in self.routes.items():
+            previous = baseline.routes.get(route)
+            if previous is None:
+                continue
+            changes[route] = {
+                f'p{rank}': round((stats[f'p{rank}'] - previous[f'p{rank}']) / previous[f'p{rank}'] * 100, 1)
+                if previous[f'p{rank}'] else 0.0
+                for rank in PERCENTILES
+            }
+        return changes
+
+    def format(self, baseline: 'ReplayReport | None' = None) -> str:
+        changes = self.diff(baseline) if baseline is not None else {}
+        lines = [f'{"route":<40} {"count":>7} {"errors":>6} {"p50 ms":>9} {"p90 ms":>9} {"p99 ms":>9}  p99 change']
+        for route, stats in self.routes.items():
+            change = changes.get(route, {}).get('p99')
+            lines.append(
+                f'{route:<40} {stats["count"]:>7} {stats["errors"]:>6} '
+                f'{stats["p50"]:>9.3f} {stats["p90"]:>9.3f} {stats["p99"]:>9.3f}  '
+                f'{"" if change is None else f"{change:+.1f}%"}'
+            )
+        return '\n'.join(lines)
+
+
+async def replay_one(app: App, record: dict[str, Any]) -> tuple[str, float, int]:
+    scope: Scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'scheme': 'http',
+        'root_path': '',
+        'method': record['method'],
+        'path': record['path'],
+        'raw_path': record['path'].encode('utf-8'),
+        'query_string': record['query_string'].encode('latin1'),
+        'headers': [(key.encode('latin1'), value.encode('latin1')) for key, value in record['headers']],
+        'replay': True,
+    }
+    received: bool = False
+    status: int = 0
+
+    async def receive() -> Message:
+        nonlocal received
+        if received:
+            return {'type': 'http.disconnect'}
+        received = True
+        return {'type': 'http.request', 'body': record['body'], 'more_body': False}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    latency = (time.perf_counter() - started) * 1000
+    return route_template(scope) or UNMATCHED, latency, status
+
+
+async def replay(
+    app: App,
+    records: list[dict[str, Any]],
+    rate: float | None = None,
+    concurrency: int = 32,
+) -> ReplayReport:
+    """
+    Drive `records` through `app`. With `rate`, requests start at that many per second whatever
+    the latency (an open model, like real traffic); otherwise they run as fast as possible,
+    `concurrency` at a time.
+    """
+    if rate is not None:
+        started = time.perf_counter()
+        tasks: list[asyncio.Task] = []
+        for index, record in enumerate(records):
+            delay = started + index / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(replay_one(app, record)))
+        return ReplayReport.from_samples(await asyncio.gather(*tasks))
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(record: dict[str, Any]) -> tuple[str, float, int]:
+        async with semaphore:
+            return await replay_one(app, record)
+
+    return ReplayReport.from_samples(await asyncio.gather(*(bounded(record) for record in records)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('app', help='The application to replay against, as module:attribute.')
+    parser.add_argument('capture', help='A capture file written by CaptureMiddleware.')
+    parser.add_argument('--rate', type=float, default=None, help='Requests per second, as fast as possible if omitted.')
+    parser.add_argument('--concurrency', type=int, default=32, help='Concurrent requests without --rate.')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of times the capture is replayed.')
+    parser.add_argument('--output', help='Save the report as JSON, to be used as a later baseline.')
+    parser.add_argument('--baseline', help='A report saved by a previous run to compare with.')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Allowed p99 regression in percent.')
+    args = parser.parse_args()
+
+    module, _, attribute = args.app.partition(':')
+    sys.path.insert(0, '')
+    app: App = getattr(importlib.import_module(module), attribute or 'app')
+
+    records = load_capture(args.capture) * args.repeat
+    report = asyncio.run(replay(app, records, rate=args.rate, concurrency=args.concurrency))
+    baseline = ReplayReport.load(args.baseline) if args.baseline else None
+
+    print(report.format(baseline))
+    if args.output:
+        report.save(args.output)
+
+    if baseline is not None:
+        regressions = {
+            route: change['p99'] for route, change in report.diff(baseline).items()
+            if change['p99'] > args.threshold
+        }
+        if regressions:
+            print(f'p99 regressed by more than {args.threshold:g}% on: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Sequence
+
+from vines.middleware import Middleware
+from vines.routing import Router, Route
+from vines.http import HttpRequest, HttpResponse, JSONResponse
+from vines.diagnostics.profiler import find_route, find_route_template
+
+__all__ = ['LoopWatchdog']
+
+
+# Upper bounds, in milliseconds, of the lag histogram buckets.
+LAG_BUCKETS: tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+
+class LoopWatchdog(Middleware):
+    """
+    Measures the lag of the event loop and finds the routes that block it.
+
+    A heartbeat task wakes up every `interval` seconds and records how late it ran into a
+    histogram. A watchdog thread checks the heartbeat; when the loop has not run it for
+    longer than `threshold` seconds, the stack of the loop thread is sampled and the block
+    is attributed to the `Route` on it. Blocks are counted per route in `offenders`.
+    An event is recorded while the block is in progress, with 'ongoing' set; the next
+    heartbeat replaces its 'blocked_ms' with how long the block lasted.
+
+    Add it to the application's middleware; it starts with the first request, once the
+    event loop is running, and costs a single attribute check per request.
+
+    **Parameters**
+    - interval: Seconds between two heartbeats.
+    - threshold: Seconds without a heartbeat after which the loop is considered blocked.
+    - max_events: The number of recent blocking events kept.
+    """
+
+    def __init__(self, interval: float = 0.01, threshold: float = 0.1, max_events: int = 100) -> None:
+        self.interval: float = interval
+        self.threshold: float = threshold
+
+        self.histogram: list[int] = [0] * len(LAG_BUCKETS)
+        self.max_lag: float = 0.0
+        self.events: deque[dict] = deque(maxlen=max_events)
+        self.offenders: Counter[str] = Counter()
+
+        self._beat: float = 0.0
+        # The event of the block in progress and the heartbeat it started after.
+        self._blocking: tuple[float, dict] | None = None
+        self._loop_thread: int | None = None
+        self._heartbeat: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped: threading.Event = threading.Event()
+
+    async def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self._heartbeat is None:
+            self.start()
+        return await self.call_next(request)
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None
+
+    def start(self) -> None:
+        """Start the heartbeat on the running event loop and the watchdog thread."""
+        if self._heartbeat is not None:
+            return
+
+        self._loop_thread = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stopped.clear()
+        self._heartbeat = asyncio.get_running_loop().create_task(self._run_heartbeat())
+        self._watchdog = threading.Thread(target=self._run_watchdog, name='vines-loop-watchdog', daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        if self._heartbeat is None:
+            return
+        self._heartbeat.cancel()
+        self._heartbeat = None
+        self._stopped.set()
+        self._watchdog.join()
+        self._watchdog = None
+
+    def reset(self) -> None:
+        self.histogram = [0] * len(LAG_BUCKETS)
+        self.max_lag = 0.0
+        self.events.clear()
+        self.offenders.clear()
+
+    async def _run_heartbeat(self) -> None:
+        interval = self.interval
+        while True:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            previous, self._beat = self._beat, now
+
+            lag = max(now - expected, 0.0)
+            blocking = self._blocking
+            if blocking is not None and blocking[0] == previous:
+                blocking[1]['blocked_ms'] = round(lag * 1000, 1)
+                blocking[1]['ongoing'] = False
+                self._blocking = None
+            if lag > self.max_lag:
+                self.max_lag = lag
+            lag_ms = lag * 1000
+            for index, bound in enumerate(LAG_BUCKETS):
+                if lag_ms <= bound:
+                    self.histogram[index] += 1
+                    break
+
+    def _run_watchdog(self) -> None:
+        reported: float | None = None
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._beat
+            blocked = time.perf_counter() - beat
+            if blocked < self.threshold or reported == beat:
+                continue
+
+            # Report every block once, while it is still in progress.
+            reported = beat
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+
+            route: Route | None = find_route(frame)
+            path = find_route_template(frame)
+            endpoint = getattr(route.endpoint, '__qualname__', repr(route.endpoint)) if route is not None else None
+            self.offenders[path] += 1
+            event = {
+                'time': time.time(),
+                'blocked_ms': round(blocked * 1000, 1),
+                'ongoing': True,
+                'route': path,
+                'endpoint': endpoint,
+                'stack': traceback.format_stack(frame),
+            }
+            self.events.append(event)
+            self._blocking = (beat, event)
+
+    def report(self) -> dict:
+        return {
+            'running': self.running,
+            'max_lag_ms': round(self.max_lag * 1000, 1),
+            'histogram': {
+                f'<={bound:g}ms' if bound != float('inf') else f'>{LAG_BUCKETS[-2]:g}ms': count
+                for bound, count in zip(LAG_BUCKETS, self.histogram)
+            },
+            'offenders': dict(self.offenders.most_common()),
+            'events': list(self.events),
+        }
+
+    def as_router(self, path: str = '/_watchdog', middleware: Sequence[Middleware] | None = None) -> Router:
+        """
+        Build an admin router exposing this watchdog. It is not protected by default,
+        pass an authentication middleware before exposing it.
+
+        - `GET {path}/`: lag histogram, top offenders and recent blocking events with stacks.
+        - `POST {path}/reset`: clear the statistics.
+        """
+
+        def report(request: HttpRequest) -> HttpResponse:
+            return JSONResponse(self.report())
+
+        def reset(request: HttpRequest) -> HttpResponse:
+            self.reset()
+            return JSONResponse(self.report())
+
+        return Router(
+            path,
+            routes=[
+                Route('/', report, methods=['GET']),
+                Route('/reset', reset, methods=['POST']),
+            ],
+            middleware=middleware,
+        )
@@ -5,7 +5,11 @@ from vines.http.requests import (
 from vines.http.responses import (
     HttpResponseHeaders,
     HttpResponse,
-    JSONResponse
+    JSONResponse,
+    PreparedResponse,
+    StreamingResponse,
+    StreamingJSONResponse,
+    prepare_response
 )
 from vines.http.exceptions import (
     HttpException,
@@ -23,6 +27,10 @@ __all__ = [
     'HttpResponseHeaders',
     'HttpResponse',
     'JSONResponse',
+    'PreparedResponse',
+    'StreamingResponse',
+    'StreamingJSONResponse',
+    'prepare_response',
     'HttpException',
     'NotFoundException',
     'MethodNotAllowedException',
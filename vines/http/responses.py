@@ -1,10 +1,10 @@
 import json
 from datetime import datetime, timedelta
-from typing import Any, Type, Literal, MutableMapping
+from typing import Any, Type, Literal, MutableMapping, Iterable, AsyncIterable, AsyncGenerator
 
 from vines.http import status as http_status
 from vines.http.utils import DateTimeEncoder
-from vines.core.types import Scope, Receive, Send
+from vines.core.types import Scope, Receive, Send, Message
 
 
 class HttpResponseHeaders(MutableMapping[str, str]):
@@ -130,28 +130,46 @@ class HttpResponse:
     def body(self) -> bytes:
         if self._body_cache is not None:
             return self._body_cache
-        
+
         if self._content is None:
-            return b''
-        if isinstance(self._content, (bytes, memoryview)):
-            return bytes(self._content)
-        if isinstance(self._content, str):
-            return self._content.encode(self.charset)
-        return str(self._content).encode(self.charset)
+            body = b''
+        elif isinstance(self._content, (bytes, memoryview)):
+            body = bytes(self._content)
+        elif isinstance(self._content, str):
+            body = self._content.encode(self.charset)
+        else:
+            body = str(self._content).encode(self.charset)
+
+        self._body_cache = body
+        return body
+
+    def encode_headers(self) -> list[tuple[bytes, bytes]]:
+        """Return the headers in the form expected by the ASGI 'http.response.start' message."""
+        return self.headers.encode()
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body: bytes = self.body
         await send({
             'type': 'http.response.start',
             'status': self.status_code,
-            'headers': self.headers.encode()}
+            'headers': self.encode_headers()}
         )
 
+        if scope.get('method') == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            return
+
+        if len(body) <= self.chunk_size:
+            await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+            return
+
+        view: memoryview = memoryview(body)
         total_sent: int = 0
-        while total_sent < len(self.body):
-            chunk: bytes = self.body[total_sent:total_sent + self.chunk_size]
+        while total_sent < len(body):
+            chunk: bytes = bytes(view[total_sent:total_sent + self.chunk_size])
             total_sent += len(chunk)
 
-            more_body: bool = total_sent < len(self.body)
+            more_body: bool = total_sent < len(body)
             await send({
                 'type': 'http.response.body',
                 'body': chunk,
@@ -174,3 +192,206 @@ class JSONResponse(HttpResponse):
             content_type='application/json',
             headers=headers
         )
+
+
+class PreparedResponse(HttpResponse):
+    """
+    A response built from an already rendered body and already encoded headers.
+
+    The headers are only turned into an `HttpResponseHeaders` instance when a middleware
+    accesses them, so a response that passes through the chain untouched is sent as-is.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        status_code: int,
+        raw_headers: list[tuple[bytes, bytes]],
+    ) -> None:
+        self._content: bytes = body
+        self._charset: str | None = None
+        self._body_cache: bytes = body
+        self._raw_headers: list[tuple[bytes, bytes]] = raw_headers
+        self._headers: HttpResponseHeaders | None = None
+        self.status_code = status_code
+
+    @property
+    def headers(self) -> HttpResponseHeaders:
+        if self._headers is None:
+            headers = HttpResponseHeaders()
+            for key, value in self._raw_headers:
+                key, value = key.decode('ascii').lower(), value.decode('latin1')
+                if key == 'set-cookie':
+                    headers._cookies.append(value)
+                elif key in headers:
+                    # Repeated headers other than set-cookie can be combined into one (RFC 9110).
+                    headers[key] = f'{headers[key]}, {value}'
+                else:
+                    headers[key] = value
+            self._headers = headers
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: HttpResponseHeaders) -> None:
+        self._headers = headers
+
+    def encode_headers(self) -> list[tuple[bytes, bytes]]:
+        if self._headers is None:
+            # A copy: the raw list may be shared by many responses, and ASGI middleware may append to the one sent.
+            return list(self._raw_headers)
+        return self._headers.encode()
+
+
+class StreamingResponse(HttpResponse):
+    """
+    A response whose body is produced by a sync or async iterable of `bytes` or `str` chunks.
+    The iterable is only consumed while the response is sent, and never for HEAD requests.
+    """
+
+    def __init__(
+        self,
+        content: Iterable[bytes | str] | AsyncIterable[bytes | str],
+        status_code: int | None = None,
+        content_type: str | None = None,
+        charset: str | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self._content: Iterable[bytes | str] | AsyncIterable[bytes | str] = content
+        self._charset: str | None = charset
+        self._body_cache: bytes | None = None
+
+        self.headers = HttpResponseHeaders(headers)
+        media_type = f'text/plain; charset={self.charset}'
+        if content_type is not None:
+            media_type = f'{content_type}; charset={self.charset}'
+        self.headers['content-type'] = media_type
+
+        if status_code is None:
+            status_code = http_status.HTTP_200_OK
+        self.status_code = status_code
+
+    @property
+    def body(self) -> bytes:
+        raise AttributeError('The body of a StreamingResponse is only available by sending it.')
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            'type': 'http.response.start',
+            'status': self.status_code,
+            'headers': self.encode_headers()}
+        )
+
+        if scope.get('method') != 'HEAD':
+            if isinstance(self._content, AsyncIterable):
+                async for chunk in self._content:
+                    await self._send_chunk(chunk, send)
+            else:
+                for chunk in self._content:
+                    await self._send_chunk(chunk, send)
+
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    async def _send_chunk(self, chunk: bytes | str, send: Send) -> None:
+        if isinstance(chunk, str):
+            chunk = chunk.encode(self.charset)
+        if chunk:
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """
+    Streams a sync or async iterable of records as a JSON array, or as newline-delimited JSON
+    with `ndjson=True`, without holding the records or the whole document in memory.
+
+    Records are encoded one by one with `encoder` and sent in chunks of about `flush_size`
+    bytes, so neither a huge string nor one message per record is produced.
+    """
+
+    def __init__(
+        self,
+        content: Iterable[Any] | AsyncIterable[Any],
+        status_code: int | None = None,
+        headers: dict[str, str] | None = None,
+        encoder: Type[json.JSONEncoder] = DateTimeEncoder,
+        ndjson: bool = False,
+        flush_size: int = 65536,
+    ) -> None:
+        self.encoder: Type[json.JSONEncoder] = encoder
+        self.ndjson: bool = ndjson
+        self.flush_size: int = flush_size
+        super().__init__(
+            self._render(content),
+            status_code=status_code,
+            content_type='application/x-ndjson' if ndjson else 'application/json',
+            headers=headers
+        )
+
+    async def _render(self, records: Iterable[Any] | AsyncIterable[Any]) -> AsyncGenerator[bytes]:
+        encode = self.encoder().encode
+        separator, opening, closing = ('\n', '', '\n') if self.ndjson else (',', '[', ']')
+        parts: list[str] = [opening]
+        size: int = 0
+        count: int = 0
+
+        def add(record: Any) -> bool:
+            """Buffer a record and tell whether the buffer should be flushed."""
+            nonlocal size, count
+            encoded: str = encode(record)
+            if count:
+                parts.append(separator)
+            parts.append(encoded)
+            count += 1
+            size += len(encoded) + 1
+            return size >= self.flush_size
+
+        def flush() -> bytes:
+            nonlocal size
+            chunk = ''.join(parts).encode(self.charset)
+            parts.clear()
+            size = 0
+            return chunk
+
+        if isinstance(records, AsyncIterable):
+            async for record in records:
+                if add(record):
+                    yield flush()
+        else:
+            for record in records:
+                if add(record):
+                    yield flush()
+
+        if count or not self.ndjson:
+            parts.append(closing)
+        yield flush()
+
+
+RENDER_SCOPE: Scope = {'type': 'http', 'method': 'GET'}
+
+
+async def prepare_response(response: HttpResponse, scope: Scope | None = None) -> PreparedResponse:
+    """
+    Render any response, streaming ones included, into a `PreparedResponse` holding its
+    complete body and encoded headers, so it can be inspected, stored or sent again.
+    """
+    if isinstance(response, PreparedResponse):
+        return response
+
+    start: Message = {}
+    chunks: list[bytes] = []
+
+    async def receive() -> Message:
+        return {'type': 'http.disconnect'}
+
+    async def send(message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            start.update(message)
+        else:
+            chunks.append(message.get('body', b''))
+
+    await response(scope or RENDER_SCOPE, receive, send)
+
+    body: bytes = b''.join(chunks)
+    headers: list[tuple[bytes, bytes]] = list(start['headers'])
+    if not any(key == b'content-length' for key, _ in headers):
+        headers.append((b'content-length', str(len(body)).encode('ascii')))
+    return PreparedResponse(body, start['status'], headers)
@@ -0,0 +1,155 @@
+import atexit
+import base64
+import gzip
+import json
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable
+
+from vines.middleware import Middleware
+from vines.http import HttpRequest, HttpResponse
+from vines.http.exceptions import HttpException
+
+__all__ = ['CaptureMiddleware', 'redact_credentials', 'load_capture']
+
+
+CREDENTIAL_HEADERS = frozenset((b'authorization', b'proxy-authorization', b'cookie', b'x-api-key'))
+
+
+def redact_credentials(record: dict[str, Any]) -> dict[str, Any] | None:
+    """The default redaction hook: masks the values of credential headers."""
+    record['headers'] = [
+        (key, '[redacted]' if key.encode('latin1') in CREDENTIAL_HEADERS else value)
+        for key, value in record['headers']
+    ]
+    return record
+
+
+def load_capture(path: str) -> list[dict[str, Any]]:
+    """Read the records of a capture file written by `CaptureMiddleware`, bodies decoded."""
+    records: list[dict[str, Any]] = []
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            record = json.loads(line)
+            record['body'] = base64.b64decode(record['body'])
+            records.append(record)
+    return records
+
+
+class CaptureMiddleware(Middleware):
+    """
+    Samples requests to a gzip-compressed JSON lines file, to be replayed by
+    `vines.diagnostics.replay` for performance regression testing.
+
+    Every record holds the method, path, query string, headers, body, response status and
+    handling duration of a request. Records pass through `redact` before being written,
+    which may edit them or return None to drop them; credential headers are masked by
+    default. Writing happens on a background thread; records that do not fit in its queue
+    are counted in `dropped`, and records failing to be redacted or written in `errors`.
+
+    Bodies are only captured when the request announces a valid Content-Length of at most
+    `max_body` bytes, other records are marked with 'body_skipped'.
+
+    **Parameters**
+    - path: The capture file, appended to.
+    - sample_rate: The fraction of requests captured, between 0 and 1.
+    - redact: A hook applied to every record.
+    - max_body: Bodies announced larger than this many bytes are not captured.
+    - max_queue: The number of records waiting to be written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float = 0.01,
+        redact: Callable[[dict[str, Any]], dict[str, Any] | None] = redact_credentials,
+        max_body: int = 65536,
+        max_queue: int = 10000,
+    ) -> None:
+        self.path: str = path
+        self.sample_rate: float = sample_rate
+        self.redact: Callable[[dict[str, Any]], dict[str, Any] | None] = redact
+        self.max_body: int = max_body
+
+        self.dropped: int = 0
+        self.errors: int = 0
+
+        self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue(maxsize=max_queue)
+        self._writer: threading.Thread | None = None
+
+    async def __call__(self, request: HttpRequest) -> HttpResponse:
+        # Replayed requests are never captured again.
+        if random.random() >= self.sample_rate or request.scope.get('replay'):
+            return await self.call_next(request)
+
+        # Chunked bodies are not captured, they could only be measured by reading them whole.
+        body: bytes | None = None
+        length: str | None = request.headers.get('content-length')
+        if length is None and request.method in ('GET', 'HEAD'):
+            body = b''
+        elif length is not None and length.isdigit() and int(length) <= self.max_body:
+            body = await request.body()
+
+        started: int = time.perf_counter_ns()
+        # Stays None when the request is cancelled, which is not recorded.
+        status: int | None = None
+        try:
+            response: HttpResponse = await self.call_next(request)
+            status = response.status_code
+        except HttpException as e:
+            status = e.status_code
+            raise
+        except Exception:
+            status = 500
+            raise
+        finally:
+            if status is not None:
+                self._record(request, body, status, time.perf_counter_ns() - started)
+        return response
+
+    def _record(self, request: HttpRequest, body: bytes | None, status: int, duration: int) -> None:
+        scope = request.scope
+        record: dict[str, Any] = {
+            'time': time.time(),
+            'method': scope['method'],
+            'path': scope['path'],
+            'query_string': scope.get('query_string', b'').decode('latin1'),
+            'headers': [(key.decode('latin1'), value.decode('latin1')) for key, value in scope.get('headers', [])],
+            'body': body or b'',
+            'status': status,
+            'duration_us': duration // 1000,
+        }
+        if body is None:
+            record['body_skipped'] = True
+        self.capture(record)
+
+    def capture(self, record: dict[str, Any]) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write, name='vines-capture', daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+
+    def _write(self) -> None:
+        with gzip.open(self.path, 'at', encoding='utf-8') as file:
+            while (record := self._queue.get()) is not None:
+                try:
+                    record = self.redact(record)
+                    if record is None:
+                        continue
+                    record['body'] = base64.b64encode(record['body']).decode('ascii')
+                    file.write(json.dumps(record) + '\n')
+                except Exception:
+                    self.errors += 1
@@ -1,59 +1,135 @@
+import json
+import time
 import traceback
+from json.encoder import encode_basestring_ascii
 
 from vines.middleware import Middleware
-from vines.http import HttpRequest, HttpResponse, JSONResponse
+from vines.http import HttpRequest, HttpResponse, JSONResponse, PreparedResponse
 from vines.http.exceptions import HttpException, MethodNotAllowedException
+from vines.http.utils import DateTimeEncoder
+
+
+JSON_CONTENT_TYPE: tuple[bytes, bytes] = (b'content-type', b'application/json; charset=utf-8')
+
+
+class ErrorRenderer:
+    """
+    Renders `HttpException` instances into JSON responses without going through `json.dumps`.
+
+    The constant part of every body is serialized once per (status, message) pair and the
+    'allowed_methods' fragment and 'Allow' header once per method set, so rendering a
+    404 or 405 only escapes the detail string and joins a few byte strings.
+    The output is byte-for-byte identical to the equivalent `JSONResponse`.
+
+    At most `max_cached` entries are kept per cache, so messages built per request (e.g.
+    with an f-string) cannot grow them without limit; the extra ones are serialized every time.
+    """
+    max_cached: int = 256
+
+    def __init__(self) -> None:
+        self._prefixes: dict[tuple[int, str], bytes] = {}
+        self._allowed: dict[tuple[str, ...], tuple[bytes, bytes]] = {}
+
+    def _prefix(self, status_code: int, message: str) -> bytes:
+        key = (status_code, message)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            prefix = json.dumps({'status': status_code, 'message': message})[:-1].encode('ascii')
+            prefix += b', "detail": '
+            if len(self._prefixes) < self.max_cached:
+                self._prefixes[key] = prefix
+        return prefix
+
+    def _allowed_methods(self, methods: list[str]) -> tuple[bytes, bytes]:
+        key = tuple(methods)
+        allowed = self._allowed.get(key)
+        if allowed is None:
+            fragment = b', "allowed_methods": ' + json.dumps(methods).encode('ascii') + b'}'
+            allowed = (fragment, ', '.join(methods).encode('latin1'))
+            if len(self._allowed) < self.max_cached:
+                self._allowed[key] = allowed
+        return allowed
+
+    def render(self, e: HttpException) -> HttpResponse:
+        if isinstance(e.detail, str):
+            detail: bytes = encode_basestring_ascii(e.detail).encode('ascii')
+        else:
+            detail: bytes = json.dumps(e.detail, cls=DateTimeEncoder).encode('ascii')
+
+        if isinstance(e, MethodNotAllowedException):
+            suffix, allow = self._allowed_methods(e.allowed_methods)
+            body = b''.join((self._prefix(e.status_code, e.message), detail, suffix))
+            return PreparedResponse(body, e.status_code, [
+                JSON_CONTENT_TYPE,
+                (b'content-length', str(len(body)).encode('ascii')),
+                (b'allow', allow),
+            ])
+
+        body = b''.join((self._prefix(e.status_code, e.message), detail, b'}'))
+        return PreparedResponse(body, e.status_code, [
+            JSON_CONTENT_TYPE,
+            (b'content-length', str(len(body)).encode('ascii')),
+        ])
 
 
 class ServerErrorMiddleware(Middleware):
+    """
+    Turns unhandled exceptions into 500 responses.
+
+    The production body is serialized once. With 'DEBUG' enabled the traceback is only
+    formatted for the first 'DEBUG_TRACEBACK_LIMIT' errors of every second; the rest get
+    the detail without a traceback so an error storm cannot saturate the worker.
+    """
+    content = {
+        'status': 500,
+        'message': 'Internal Server Error',
+        'detail': 'An unexpected error occurred on the server.'
+    }
+
+    def __init__(self) -> None:
+        self._body: bytes = json.dumps(self.content).encode('ascii')
+        self._headers: list[tuple[bytes, bytes]] = [
+            JSON_CONTENT_TYPE,
+            (b'content-length', str(len(self._body)).encode('ascii')),
+        ]
+        self._window: int = 0
+        self._tracebacks: int = 0
+
+    def _allow_traceback(self, limit: int | None) -> bool:
+        if limit is None:
+            return True
+
+        window = int(time.monotonic())
+        if window != self._window:
+            self._window = window
+            self._tracebacks = 0
+
+        self._tracebacks += 1
+        return self._tracebacks <= limit
 
     async def __call__(self, request: HttpRequest) -> HttpResponse | None:
         try:
             return await self.call_next(request)
         except Exception as e:
-            app = request.app
+            settings = request.app.settings
 
-            content = {
-                'status': 500,
-                'message': 'Internal Server Error',
-                'detail': 'An unexpected error occurred on the server.'
-            }
+            if not settings['DEBUG']:
+                return PreparedResponse(self._body, 500, self._headers)
 
-            if not app.settings['DEBUG']:
-                response = JSONResponse(content, status_code=500)
-                return response
-
-            content['detail'] = str(e)
-            content['traceback'] = traceback.format_exc().splitlines()
-            response = JSONResponse(content, status_code=500)
-            return response
+            content = self.content | {'detail': str(e)}
+            if self._allow_traceback(settings.get('DEBUG_TRACEBACK_LIMIT')):
+                content['traceback'] = traceback.format_exc().splitlines()
+            return JSONResponse(content, status_code=500)
 
 
 class ExceptionMiddleware(Middleware):
 
+    def __init__(self) -> None:
+        self.renderer = ErrorRenderer()
+
     async def __call__(self, request: HttpRequest) -> HttpResponse | None:
         try:
             response = await self.call_next(request)
             return response
-        except MethodNotAllowedException as e:
-            response = JSONResponse(
-                content={
-                    'status': e.status_code,
-                    'message': e.message,
-                    'detail': e.detail,
-                    'allowed_methods': e.allowed_methods
-                },
-                status_code=e.status_code,
-            )
-            response.headers['Allow'] = ', '.join(e.allowed_methods)
-            return response
         except HttpException as e:
-            response = JSONResponse(
-                content={
-                    'status': e.status_code,
-                    'message': e.message,
-                    'detail': e.detail,
-                },
-                status_code=e.status_code
-            )
-            return response
+            return self.renderer.render(e)
@@ -1,3 +1,18 @@
-from vines.routing.base import Router, Route
+from vines.routing.base import Router, Route, Mount
 from vines.routing.converters import Converter
 from vines.routing.converters import get_converters, register_converter
+from vines.routing.utils import route_template, dump_route_table, load_route_table
+
+# Imported on first access: they depend on asyncio, which would otherwise dominate `import vines`.
+LAZY_IMPORTS: dict[str, str] = {
+    'BatchRoute': 'vines.routing.batch',
+    'SingleFlight': 'vines.routing.coalesce',
+}
+
+
+def __getattr__(name: str):
+    if name not in LAZY_IMPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    import importlib
+    return getattr(importlib.import_module(LAZY_IMPORTS[name]), name)
@@ -1,11 +1,25 @@
-import inspect
 import re
-from typing import Any, Callable, Awaitable, Sequence
+from functools import cached_property
+from typing import Any, Callable, Awaitable, Sequence, TYPE_CHECKING
 
 from vines.middleware import Middleware
-from vines.routing.utils import _route_to_regex
-from vines.http import HTTP_METHODS, HttpRequest, HttpResponse
+from vines.routing.utils import _route_to_pattern, is_coroutine_function, URLTemplate
+from vines.http import HTTP_METHODS, HttpRequest, HttpResponse, HttpResponseHeaders, PreparedResponse
 from vines.http.exceptions import NotFoundException, MethodNotAllowedException
+from vines.core.types import App, Scope, Receive, Send, Message
+
+if TYPE_CHECKING:
+    from vines.routing.coalesce import SingleFlight
+    from vines.core.workers import ProcessPool
+
+
+# Shared result for routes that do not match, so misses (e.g. scanner 404s) do not allocate.
+NO_MATCH: tuple[bool, dict[str, Any]] = (False, {})
+
+# Scope keys set by the application and its routers, which must not leak into a mounted application.
+ROUTING_SCOPE_KEYS: frozenset[str] = frozenset(
+    ('app', 'params', 'sub_path', 'route', 'route_prefix', 'mount_path', 'subdomain')
+)
 
 
 class BaseRoute:
@@ -26,38 +40,146 @@ class Route(BaseRoute):
         path: str,
         endpoint: Callable[[HttpRequest], Awaitable[HttpResponse] | HttpResponse],
         methods: list[str] = None,
+        coalesce: 'SingleFlight | None' = None,
+        offload: 'bool | ProcessPool' = False,
+        name: str | None = None,
     ) -> None:
         assert path.startswith('/'), 'Routes must start with \'/\''
 
         self.path: str = path
         self.endpoint: Callable[[HttpRequest], Awaitable[HttpResponse] | HttpResponse] = endpoint
+        # The name the route is found by in `Router.url_for`.
+        self.name: str | None = name or getattr(endpoint, '__name__', None)
         self.methods: list[str] = list(methods or HTTP_METHODS)
-
-        self._regex, self._converters = _route_to_regex(path)
+        if 'GET' in self.methods and 'HEAD' not in self.methods:
+            self.methods.append('HEAD')
+        self.coalesce: 'SingleFlight | None' = coalesce
+        # True runs the endpoint in the application's process pool, see `Vines.process_pool`.
+        self.offload: 'bool | ProcessPool' = offload
+        self._is_coroutine: bool = is_coroutine_function(endpoint)
+
+        self._pattern, self._converters = _route_to_pattern(path)
+        # The literal text before the first parameter is checked before the regex, so most
+        # misses never compile or run it. Routes without parameters only compare strings.
+        self._prefix: str = path.split('{', 1)[0]
+        self._static: bool = not self._converters
+
+    @cached_property
+    def _regex(self) -> re.Pattern[str]:
+        # Compiled on the first match rather than at import, which keeps large apps quick to start.
+        return re.compile(self._pattern)
 
     def matches(self, path: str, method: str) -> tuple[bool, dict[str, Any]]:
-        match: re.Match[str] = self._regex.match(path)
-        if match is None:
-            return False, {}
+        if self._static:
+            if path != self.path:
+                return NO_MATCH
+            match = None
+        else:
+            if not path.startswith(self._prefix):
+                return NO_MATCH
+            match: re.Match[str] | None = self._regex.match(path)
+            if match is None:
+                return NO_MATCH
 
         if method not in self.methods:
             return False, {'methods': self.methods}
 
-        params = match.groupdict()
+        params = {} if match is None else match.groupdict()
         for key, value in params.items():
             params[key] = self._converters[key].to_value(value)
 
-        return True, {'params': params, 'sub_path': path}
+        return True, {'params': params, 'sub_path': path, 'route': self}
 
     async def __call__(self, request: HttpRequest) -> HttpResponse:
-        if inspect.iscoroutinefunction(self.endpoint):
+        if self.coalesce is not None:
+            return await self.coalesce(request, self.call_endpoint)
+        return await self.call_endpoint(request)
+
+    async def call_endpoint(self, request: HttpRequest) -> HttpResponse:
+        if self.offload:
+            pool = request.app.process_pool if self.offload is True else self.offload
+            return await pool.run(self.endpoint, request)
+        if self._is_coroutine:
             return await self.endpoint(request)
         return self.endpoint(request)
 
 
+class Mount(BaseRoute):
+    """
+    Mounts a raw ASGI application under a path prefix.
+
+    Requests under the prefix are passed to the application with the prefix moved from
+    'path' to 'root_path'. Mounts given to `Vines` directly are dispatched before any request
+    object, middleware or response is created; mounts inside a `Router` are reached through
+    its middleware chain like any other route.
+    """
+
+    def __init__(self, path: str, app: App) -> None:
+        assert path.startswith('/'), 'Routes must start with \'/\''
+
+        self.path: str = path.rstrip('/')
+        self.app: App = app
+        self._prefix: str = self.path + '/'
+
+    def matches_path(self, path: str) -> bool:
+        return path == self.path or path.startswith(self._prefix)
+
+    def matches(self, path: str, method: str) -> tuple[bool, dict[str, Any]]:
+        if not self.matches_path(path):
+            return NO_MATCH
+        return True, {'mount_path': path}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send, path: str | None = None) -> None:
+        """Pass the connection to the mounted application, `path` being the path relative to the mount's parent."""
+        path = scope['path'] if path is None else path
+        child_scope = {key: value for key, value in scope.items() if key not in ROUTING_SCOPE_KEYS}
+        child_scope['root_path'] = scope.get('root_path', '') + scope['path'][:len(scope['path']) - len(path)] + self.path
+        child_scope['path'] = path[len(self.path):] or '/'
+        await self.app(child_scope, receive, send)
+
+    async def __call__(self, request: HttpRequest) -> HttpResponse:
+        return MountResponse(self, request.scope['mount_path'])
+
+
+class MountResponse(HttpResponse):
+    """
+    Hands the connection over to a mounted application when a nested router reaches a `Mount`.
+
+    The body is produced by the application, so it is empty here and the status code is
+    only known once sent. Headers set by a middleware are added to those of the application,
+    replacing them.
+    """
+
+    def __init__(self, mount: Mount, path: str) -> None:
+        self._content: Any = None
+        self._charset: str | None = None
+        self._body_cache: bytes = b''
+        self.headers: HttpResponseHeaders = HttpResponseHeaders()
+        self.mount: Mount = mount
+        self.path: str = path
+        self.status_code: int | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def tracking_send(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                self.status_code = message['status']
+                extra = self.headers.encode()
+                if extra:
+                    replaced = {key for key, _ in extra if key != b'set-cookie'}
+                    headers = [(key, value) for key, value in message.get('headers', []) if key.lower() not in replaced]
+                    message = {**message, 'headers': headers + extra}
+            await send(message)
+
+        await self.mount.handle(scope, receive, tracking_send, self.path)
+
+
 class Router(BaseRoute):
     """Represents a collection of routes, acting as a nested router."""
 
+    # Bumped whenever a route is added to any router, which invalidates the name index of
+    # every router, since a router's index covers the routers nested in it.
+    routes_version: int = 0
+
     def __init__(
         self,
         path: str,
@@ -69,15 +191,30 @@ class Router(BaseRoute):
         self.middleware: list[Middleware] = list(middleware or [])
 
         self._middleware_chain = None
-        self._regex, self._converters = _route_to_regex(path + '/{path:path}')
+        self._url_templates: dict[str, URLTemplate] | None = None
+        self._url_templates_version: int = -1
+        self._options_headers: dict[tuple[str, ...], list[tuple[bytes, bytes]]] = {}
+        self._pattern, self._converters = _route_to_pattern(path + '/{path:path}')
+        # Prefixes without parameters are matched with a plain string comparison.
+        self._prefix: str | None = None if '{' in path else path + '/'
+
+    @cached_property
+    def _regex(self) -> re.Pattern[str]:
+        return re.compile(self._pattern)
 
     def add_route(
         self,
         path: str,
         endpoint: Callable[[HttpRequest], Awaitable[HttpResponse] | HttpResponse],
         methods: list[str] | None = None,
+        **options: Any,
     ) -> None:
-        self.routes.append(Route(path, endpoint, methods=methods))
+        self.routes.append(Route(path, endpoint, methods=methods, **options))
+        Router.routes_version += 1
+
+    def add_mount(self, path: str, app: App) -> None:
+        self.routes.append(Mount(path, app))
+        Router.routes_version += 1
 
     def add_router(
         self,
@@ -86,27 +223,52 @@ class Router(BaseRoute):
         middleware: Sequence[Middleware] | None = None,
     ) -> None:
         self.routes.append(Router(path, routes=routes, middleware=middleware))
+        Router.routes_version += 1
 
-    def route(self, path: str, methods: list[str] | None = None) -> Callable:
+    def route(self, path: str, methods: list[str] | None = None, **options: Any) -> Callable:
+        """Register the decorated function as an endpoint, `options` are passed to `Route`."""
         def decorator(func: Callable[[HttpRequest], Awaitable[HttpResponse] | HttpResponse]) -> Callable:
-            self.add_route(path, func, methods=methods)
+            self.add_route(path, func, methods=methods, **options)
             return func
         return decorator
 
-    def get(self, path: str) -> Callable:
-        return self.route(path, methods=['GET'])
+    def get(self, path: str, **options: Any) -> Callable:
+        return self.route(path, methods=['GET'], **options)
+
+    def post(self, path: str, **options: Any) -> Callable:
+        return self.route(path, methods=['POST'], **options)
+
+    def put(self, path: str, **options: Any) -> Callable:
+        return self.route(path, methods=['PUT'], **options)
 
-    def post(self, path: str) -> Callable:
-        return self.route(path, methods=['POST'])
+    def patch(self, path: str, **options: Any) -> Callable:
+        return self.route(path, methods=['PATCH'], **options)
 
-    def put(self, path: str) -> Callable:
-        return self.route(path, methods=['PUT'])
+    def delete(self, path: str, **options: Any) -> Callable:
+        return self.route(path, methods=['DELETE'], **options)
 
-    def patch(self, path: str) -> Callable:
-        return self.route(path, methods=['PATCH'])
+    def url_for(self, name: str, /, **params: Any) -> str:
+        """
+        Build the path of the route named `name`, relative to this router, with `params`
+        converted by the `to_url` of their converters. Nested routers are searched too,
+        and the first route with a name wins, as it does when matching.
+        """
+        if self._url_templates_version != Router.routes_version:
+            self._url_templates = {}
+            self._url_templates_version = Router.routes_version
+            self._index_url_templates(self, '')
 
-    def delete(self, path: str) -> Callable:
-        return self.route(path, methods=['DELETE'])
+        template = self._url_templates.get(name)
+        if template is None:
+            raise ValueError(f'No route named {name}.')
+        return template.build(params)
+
+    def _index_url_templates(self, router: 'Router', prefix: str) -> None:
+        for route in router.routes:
+            if isinstance(route, Router):
+                self._index_url_templates(route, prefix + route.path)
+            elif isinstance(route, Route) and route.name is not None and route.name not in self._url_templates:
+                self._url_templates[route.name] = URLTemplate(prefix + route.path)
 
     def build_middleware_chain(self) -> Callable[[HttpRequest], Awaitable[HttpResponse]]:
         chain = self.handle
@@ -116,9 +278,14 @@ class Router(BaseRoute):
         return chain
 
     def matches(self, path: str, method: str) -> tuple[bool, dict[str, Any]]:
+        if self._prefix is not None:
+            if not path.startswith(self._prefix):
+                return NO_MATCH
+            return True, {'params': {}, 'sub_path': path[len(self._prefix) - 1:]}
+
         match: re.Match[str] = self._regex.match(path)
         if match is None:
-            return False, {}
+            return NO_MATCH
 
         params = match.groupdict()
         for key, value in params.items():
@@ -126,18 +293,41 @@ class Router(BaseRoute):
         remaining_path = '/' + params.pop('path')
         return True, {'params': params, 'sub_path': remaining_path}
 
+    def options_response(self, allowed_methods: list[str]) -> HttpResponse:
+        """
+        Answer an OPTIONS (or CORS preflight) request for a path whose routes do not handle
+        OPTIONS themselves. The headers are computed once per method set.
+        """
+        key = tuple(allowed_methods)
+        headers = self._options_headers.get(key)
+        if headers is None:
+            allow = ', '.join(dict.fromkeys(allowed_methods + ['OPTIONS'])).encode('latin1')
+            headers = [
+                (b'allow', allow),
+                (b'access-control-allow-methods', allow),
+            ]
+            self._options_headers[key] = headers
+        return PreparedResponse(b'', 204, headers)
+
     async def handle(self, request: HttpRequest) -> HttpResponse:
         path: str = request.scope.get('sub_path') or request.path
-        allowed_methods: list[str] = []
+        allowed_methods: list[str] | None = None
 
         for route in self.routes:
             is_match, child_scope = route.matches(path, request.method)
             if is_match:
+                if isinstance(route, Router):
+                    child_scope['route_prefix'] = request.scope.get('route_prefix', '') + route.path
                 request.scope.update(child_scope)
                 return await route(request)
-            allowed_methods.extend(child_scope.get('methods', []))
+
+            methods: list[str] | None = child_scope.get('methods')
+            if methods:
+                allowed_methods = methods if allowed_methods is None else allowed_methods + methods
 
         if allowed_methods:
+            if request.method == 'OPTIONS':
+                return self.options_response(allowed_methods)
             raise MethodNotAllowedException(request.method, allowed_methods)
 
         raise NotFoundException(request.path)
@@ -0,0 +1,185 @@
+import asyncio
+import json
+from typing import Any, AsyncGenerator
+
+from vines.routing.base import Route
+from vines.http import (
+    HttpRequest,
+    HttpResponse,
+    JSONResponse,
+    PreparedResponse,
+    StreamingResponse,
+    prepare_response,
+)
+from vines.http.exceptions import HttpException
+from vines.middleware.error import ServerErrorMiddleware
+from vines.core.types import Scope, Message
+
+__all__ = ['BatchRoute']
+
+
+# Headers of the batch request that describe its own body and must not leak into sub-requests.
+BODY_HEADERS = (b'content-type', b'content-length', b'transfer-encoding')
+
+
+class BatchRoute(Route):
+    """
+    A POST route that runs many sub-requests in a single HTTP call.
+
+    The request body is a JSON list (or `{"requests": [...]}`) of objects with a 'path' and
+    optionally a 'method', 'headers' and 'body'. A string body is sent as-is, any other JSON
+    value is serialized with an 'application/json' content type. Sub-requests inherit the
+    headers of the batch request (e.g. 'Authorization') and are dispatched concurrently
+    through the router of the host they are addressed to, middleware included.
+
+    The response lists one result per sub-request, in order, with its 'status', 'headers'
+    and 'body' (decoded JSON when the sub-response is JSON). With `stream=True` the results
+    are sent as newline-delimited JSON as soon as each sub-request completes, each carrying
+    the 'index' of its sub-request.
+
+    **Parameters**
+    - path: The path of the batch route.
+    - max_requests: The maximum number of sub-requests in a batch.
+    - concurrency: The maximum number of sub-requests running at the same time.
+    - stream: Stream the results as NDJSON in completion order.
+    """
+
+    def __init__(self, path: str, max_requests: int = 50, concurrency: int = 10, stream: bool = False) -> None:
+        super().__init__(path, self.dispatch, methods=['POST'])
+        self.max_requests: int = max_requests
+        self.concurrency: int = concurrency
+        self.stream: bool = stream
+
+    async def dispatch(self, request: HttpRequest) -> HttpResponse:
+        if request.scope.get('batch'):
+            raise HttpException(message='Bad Request', detail='Batch requests cannot be nested.')
+
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise HttpException(message='Bad Request', detail='The batch body must be valid JSON.')
+
+        entries = payload.get('requests') if isinstance(payload, dict) else payload
+        if not isinstance(entries, list):
+            raise HttpException(message='Bad Request', detail='The batch body must be a list of requests.')
+        if len(entries) > self.max_requests:
+            raise HttpException(
+                message='Bad Request',
+                detail=f'A batch cannot contain more than {self.max_requests} requests.'
+            )
+
+        scopes = [self.build_scope(request, index, entry) for index, entry in enumerate(entries)]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        if self.stream:
+            return StreamingResponse(self.stream_results(request, scopes, semaphore), content_type='application/x-ndjson')
+
+        results = await asyncio.gather(*(self.run(request, scope, semaphore) for scope in scopes))
+        return JSONResponse({'responses': results})
+
+    def build_scope(self, request: HttpRequest, index: int, entry: Any) -> tuple[Scope, bytes]:
+        if not isinstance(entry, dict) or not isinstance(entry.get('path'), str) or not entry['path'].startswith('/'):
+            raise HttpException(
+                message='Bad Request',
+                detail=f'Request {index} of the batch must be an object with a \'path\' starting with \'/\'.'
+            )
+
+        headers: dict[bytes, bytes] = {
+            key: value for key, value in request.scope.get('headers', []) if key not in BODY_HEADERS
+        }
+        body = entry.get('body')
+        if body is None:
+            body = b''
+        elif isinstance(body, str):
+            body = body.encode('utf-8')
+        else:
+            body = json.dumps(body).encode('utf-8')
+            headers[b'content-type'] = b'application/json'
+        if body:
+            headers[b'content-length'] = str(len(body)).encode('ascii')
+
+        extra_headers = entry.get('headers') or {}
+        if not isinstance(extra_headers, dict):
+            raise HttpException(
+                message='Bad Request',
+                detail=f'The \'headers\' of request {index} of the batch must be an object.'
+            )
+        path, _, query_string = entry['path'].partition('?')
+        try:
+            for key, value in extra_headers.items():
+                headers[key.lower().encode('latin1')] = str(value).encode('latin1')
+            query_string: bytes = query_string.encode('latin1')
+        except UnicodeEncodeError:
+            raise HttpException(
+                message='Bad Request',
+                detail=f'The headers and query string of request {index} of the batch must be latin-1.'
+            )
+
+        scope: Scope = {
+            key: value for key, value in request.scope.items()
+            if key in ('type', 'asgi', 'http_version', 'scheme', 'server', 'client', 'root_path', 'app')
+        }
+        scope.update({
+            'method': str(entry.get('method', 'GET')).upper(),
+            'path': path,
+            'raw_path': path.encode('utf-8'),
+            'query_string': query_string,
+            'headers': list(headers.items()),
+            'batch': True,
+        })
+        return scope, body
+
+    async def run(self, request: HttpRequest, sub_request: tuple[Scope, bytes], semaphore: asyncio.Semaphore) -> dict:
+        scope, body = sub_request
+        received: bool = False
+
+        async def receive() -> Message:
+            nonlocal received
+            if received:
+                return {'type': 'http.disconnect'}
+            received = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async with semaphore:
+            try:
+                # Sub-requests keep the Host header of the batch, so they stay on the same host's routes.
+                router = request.app.host_router(scope)
+                response: HttpResponse = await router(HttpRequest(scope, receive))
+                # Bodies produced while sending (streaming, mounts) can still fail past the error middleware.
+                prepared: PreparedResponse = await prepare_response(response, scope)
+            except Exception:
+                return {
+                    'status': 500,
+                    'headers': {'content-type': 'application/json; charset=utf-8'},
+                    'body': ServerErrorMiddleware.content,
+                }
+
+        headers: dict[str, str] = {}
+        for key, value in prepared.encode_headers():
+            key, value = key.decode('latin1'), value.decode('latin1')
+            headers[key] = f'{headers[key]}, {value}' if key in headers else value
+
+        content: Any = prepared.body.decode('utf-8', errors='replace')
+        if content and headers.get('content-type', '').startswith('application/json'):
+            try:
+                content = json.loads(content)
+            except ValueError:
+                pass
+        return {'status': prepared.status_code, 'headers': headers, 'body': content}
+
+    async def stream_results(
+        self,
+        request: HttpRequest,
+        scopes: list[tuple[Scope, bytes]],
+        semaphore: asyncio.Semaphore,
+    ) -> AsyncGenerator[str]:
+        async def indexed(index: int, sub_request: tuple[Scope, bytes]) -> dict:
+            return {'index': index} | await self.run(request, sub_request, semaphore)
+
+        tasks = [asyncio.ensure_future(indexed(index, scope)) for index, scope in enumerate(scopes)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield json.dumps(await task) + '\n'
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Callable, Awaitable, Hashable, Sequence
+
+from vines.http import HttpRequest, HttpResponse, PreparedResponse, prepare_response
+from vines.http.exceptions import HttpException
+from vines.http.status import HTTP_504_GATEWAY_TIMEOUT
+
+__all__ = ['SingleFlight']
+
+
+# Part of every default key, so a response is never shared between users.
+CREDENTIAL_HEADERS: tuple[str, ...] = ('authorization', 'cookie')
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent requests to a route into a single endpoint call.
+
+    The first request for a key (the leader) runs the endpoint, and every request with the
+    same key arriving before it finishes waits for its result instead of running it again.
+    The response is rendered once and every waiter receives the same bytes; an exception
+    raised by the leader is raised for every waiter too. Waiters give up with a 504 after
+    `timeout` seconds if the leader stalls. Nothing is cached once the leader is done.
+
+    The default key is made of the method, the path, the whole query string and the
+    Authorization and Cookie headers, so only requests of the same user are coalesced.
+    A custom `key` must keep apart the requests whose responses differ, credentials included.
+
+    **Parameters**
+    - query_params: The query parameters that are part of the key, instead of the whole query string.
+    - headers: Additional request headers that are part of the key, e.g. 'accept-language'.
+    - methods: The methods that are coalesced, other requests always run the endpoint.
+    - timeout: Seconds a waiter waits for the leader.
+    - key: A callable building the key from the request, replacing the parameters above.
+    """
+
+    def __init__(
+        self,
+        query_params: Sequence[str] = (),
+        headers: Sequence[str] = (),
+        methods: Sequence[str] = ('GET', 'HEAD'),
+        timeout: float | None = 10.0,
+        key: Callable[[HttpRequest], Hashable] | None = None,
+    ) -> None:
+        self.query_params: tuple[str, ...] = tuple(query_params)
+        self.headers: tuple[str, ...] = CREDENTIAL_HEADERS + tuple(
+            header.lower() for header in headers if header.lower() not in CREDENTIAL_HEADERS
+        )
+        self.methods: frozenset[str] = frozenset(methods)
+        self.timeout: float | None = timeout
+        self.key: Callable[[HttpRequest], Hashable] = key or self.default_key
+
+        self._in_flight: dict[Hashable, asyncio.Future[PreparedResponse]] = {}
+
+    def default_key(self, request: HttpRequest) -> Hashable:
+        # HEAD shares the GET flight, the body is only dropped when the response is sent.
+        method = 'GET' if request.method == 'HEAD' else request.method
+        key: tuple = (method, request.scope.get('root_path', ''), request.path)
+        if self.query_params:
+            query_params = request.query_params
+            key += tuple(query_params.get(name) for name in self.query_params)
+        else:
+            key += (request.scope.get('query_string', b''),)
+        headers = request.headers
+        key += tuple(headers.get(name) for name in self.headers)
+        return key
+
+    async def __call__(
+        self,
+        request: HttpRequest,
+        call_endpoint: Callable[[HttpRequest], Awaitable[HttpResponse]],
+    ) -> HttpResponse:
+        if request.method not in self.methods:
+            return await call_endpoint(request)
+
+        key: Hashable = self.key(request)
+        flight = self._in_flight.get(key)
+        if flight is not None:
+            try:
+                response: PreparedResponse = await asyncio.wait_for(asyncio.shield(flight), self.timeout)
+            except asyncio.TimeoutError:
+                raise HttpException(
+                    HTTP_504_GATEWAY_TIMEOUT,
+                    'Gateway Timeout',
+                    'Timed out waiting for an identical request in progress.'
+                )
+            return self._copy(response)
+
+        flight = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = flight
+        try:
+            response: PreparedResponse = await prepare_response(await call_endpoint(request))
+        except Exception as e:
+            self._fail(flight, e)
+            raise
+        except asyncio.CancelledError:
+            self._fail(flight, HttpException(
+                HTTP_504_GATEWAY_TIMEOUT,
+                'Gateway Timeout',
+                'The identical request in progress was cancelled.'
+            ))
+            raise
+        else:
+            flight.set_result(response)
+            return self._copy(response)
+        finally:
+            del self._in_flight[key]
+
+    @staticmethod
+    def _fail(flight: asyncio.Future, exception: Exception) -> None:
+        flight.set_exception(exception)
+        # Mark the exception as retrieved, nobody may be waiting for it.
+        flight.exception()
+
+    @staticmethod
+    def _copy(response: PreparedResponse) -> PreparedResponse:
+        # Every request gets its own instance, so a middleware can change the headers of one.
+        return PreparedResponse(response.body, response.status_code, response.encode_headers())
@@ -1,4 +1,5 @@
 from typing import Any, Type, TypeVar, Generic
+from urllib.parse import quote
 
 __all__ = ['Converter', 'get_converters', 'register_converter']
 
@@ -23,12 +24,15 @@ class StringConverter(Converter[str]):
         return value
 
     def to_url(self, value: str) -> str:
-        return value
+        return quote(value, safe='')
 
 
 class PathConverter(StringConverter):
     regex = '.*'
 
+    def to_url(self, value: str) -> str:
+        return quote(value)
+
 
 class IntConverter(Converter[int]):
     regex = '[0-9]+'
@@ -59,12 +63,17 @@ BUILTIN_CONVERTERS: dict[str, Converter] = {
 
 registered_converters: dict[str, Converter] = {}
 
+# Merged lookup shared by every route, rebuilt only when a converter is registered.
+_converters: dict[str, Converter] = dict(BUILTIN_CONVERTERS)
+
 
 def register_converter(name: str, converter: Type[Converter[Any]]) -> None:
     if name in registered_converters or name in BUILTIN_CONVERTERS:
         raise ValueError(f'Converter {name} is already registered.')
     registered_converters[name] = converter()
+    _converters[name] = registered_converters[name]
 
 
 def get_converters() -> dict[str, Converter[Any]]:
-    return {**BUILTIN_CONVERTERS, **registered_converters}
+    """Return the shared converter lookup, it must not be modified."""
+    return _converters
@@ -1,15 +1,40 @@
+import json
 import re
+from functools import partial
+from typing import IO, Any, Callable
 
 from vines.routing.converters import get_converters, Converter
+from vines.core.types import Scope
 
 
 PATH_REGEX = r'{(?:(?P<parameter>[^}:]+):)?(?P<converter>[^}]+)}'
 
+ROUTE_TABLE_VERSION = 1
+
+# Same value as `inspect.CO_COROUTINE`, `inspect` alone is a large share of the import time.
+CO_COROUTINE = 0x80
+
+# Translated route templates, `path -> (regex, {parameter: converter name})`. Filled as routes
+# are created, or up front from a snapshot with `load_route_table`.
+ROUTE_TABLE: dict[str, tuple[str, dict[str, str]]] = {}
+
+
+def is_coroutine_function(func: Any) -> bool:
+    """A lightweight `inspect.iscoroutinefunction` for endpoints, unwrapping methods and partials."""
+    while isinstance(func, partial):
+        func = func.func
+    code = getattr(getattr(func, '__func__', func), '__code__', None)
+    return code is not None and bool(code.co_flags & CO_COROUTINE)
+
+
+def _parse_route(path: str) -> tuple[str, dict[str, str]]:
+    """Translate a path string with parameters into a regular expression and the converter name of every parameter."""
+    parsed = ROUTE_TABLE.get(path)
+    if parsed is not None:
+        return parsed
 
-def _route_to_regex(path: str) -> tuple[re.Pattern[str], dict[str, Converter]]:
-    """Convert a path string with parameters into a regular expression pattern and map parameters to converters."""
     converter_types = get_converters()
-    converters: dict[str, Converter] = {}
+    converters: dict[str, str] = {}
     regex: str = '^'
 
     previous: int = 0
@@ -21,7 +46,7 @@ def _route_to_regex(path: str) -> tuple[re.Pattern[str], dict[str, Converter]]:
             raise Exception(
                 f'Route {path} uses invalid converter {converter_type}.'
             )
-        converters[parameter] = converter
+        converters[parameter] = converter_type
 
         regex += re.escape(path[previous:match.start()])
         regex += f'(?P<{parameter}>{converter.regex})'
@@ -30,4 +55,109 @@ def _route_to_regex(path: str) -> tuple[re.Pattern[str], dict[str, Converter]]:
 
     regex += re.escape(path[previous:])
     regex += '$'
+
+    ROUTE_TABLE[path] = (regex, converters)
+    return regex, converters
+
+
+def _route_to_pattern(path: str) -> tuple[str, dict[str, Converter]]:
+    """Convert a path string with parameters into an uncompiled regular expression and map parameters to converters."""
+    regex, converter_names = _parse_route(path)
+
+    converter_types = get_converters()
+    converters: dict[str, Converter] = {}
+    for parameter, converter_type in converter_names.items():
+        converter = converter_types.get(converter_type, None)
+        if converter is None:
+            raise Exception(
+                f'Route {path} uses invalid converter {converter_type}.'
+            )
+        converters[parameter] = converter
+
+    return regex, converters
+
+
+def _route_to_regex(path: str) -> tuple[re.Pattern[str], dict[str, Converter]]:
+    """Convert a path string with parameters into a regular expression pattern and map parameters to converters."""
+    regex, converters = _route_to_pattern(path)
     return re.compile(regex), converters
+
+
+class URLTemplate:
+    """
+    A route path precompiled for building URLs: the literal parts of the path with a
+    converter slot between every two of them, joined without any regex or parsing.
+    """
+    __slots__ = ('path', 'literals', 'slots')
+
+    def __init__(self, path: str) -> None:
+        converter_types = get_converters()
+        literals: list[str] = []
+        slots: list[tuple[str, Converter]] = []
+
+        previous: int = 0
+        for match in re.finditer(PATH_REGEX, path):
+            parameter, converter_type = match.groups(default='str')
+            converter = converter_types.get(converter_type, None)
+            if converter is None:
+                raise Exception(
+                    f'Route {path} uses invalid converter {converter_type}.'
+                )
+            literals.append(path[previous:match.start()])
+            slots.append((parameter, converter))
+            previous = match.end()
+        literals.append(path[previous:])
+
+        self.path: str = path
+        self.literals: tuple[str, ...] = tuple(literals)
+        # Every slot holds its parameter, the bound `to_url` of its converter and the literal after it.
+        self.slots: tuple[tuple[str, Callable[[Any], str], str], ...] = tuple(
+            (parameter, converter.to_url, literal)
+            for (parameter, converter), literal in zip(slots, literals[1:])
+        )
+
+    def build(self, params: dict[str, Any]) -> str:
+        slots = self.slots
+        if not slots and not params:
+            return self.path
+        if len(params) != len(slots):
+            self._invalid(params)
+
+        parts: list[str] = [self.literals[0]]
+        try:
+            for parameter, to_url, literal in slots:
+                parts.append(to_url(params[parameter]))
+                parts.append(literal)
+        except KeyError:
+            self._invalid(params)
+        return ''.join(parts)
+
+    def _invalid(self, params: dict[str, Any]) -> None:
+        expected = [slot[0] for slot in self.slots]
+        raise ValueError(
+            f'Route {self.path} expects parameters {expected}, got {list(params)}.'
+        )
+
+
+def dump_route_table(file: IO[str]) -> None:
+    """Write every route template translated so far to `file`, to be loaded at startup with `load_route_table`."""
+    json.dump({'version': ROUTE_TABLE_VERSION, 'routes': ROUTE_TABLE}, file)
+
+
+def load_route_table(file: IO[str]) -> None:
+    """Load a snapshot written by `dump_route_table`, so the routes it contains are not parsed again."""
+    snapshot = json.load(file)
+    version = snapshot.get('version')
+    if version != ROUTE_TABLE_VERSION:
+        raise ValueError(f'Unsupported route table version {version}.')
+
+    for path, (regex, converters) in snapshot['routes'].items():
+        ROUTE_TABLE[path] = (regex, converters)
+
+
+def route_template(scope: Scope) -> str | None:
+    """Return the full path template of the route that handled the request, e.g. '/api/users/{id:int}'."""
+    route = scope.get('route')
+    if route is None:
+        return None
+    return scope.get('route_prefix', '') + route.path